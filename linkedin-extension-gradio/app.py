@@ -1,8 +1,13 @@
 import gradio as gr
 import requests
 import pandas as pd
+import os
+import threading
 import time
 import json
+from collections import OrderedDict
+
+from table_render import COPY_HANDLER_HEAD, render_table
 
 # Define campaign IDs (same as in the extension)
 CAMPAIGN_IDS = [
@@ -16,10 +21,41 @@ CAMPAIGN_IDS = [
 API_BASE_URL = 'http://localhost:3070'
 ITEMS_PER_PAGE = 10
 
-# Global variables to store job state
-job_id = None
-job_status = "idle"  # idle, processing, completed, error
-current_page = 1
+# Background polling of the active job: seconds between polls start at POLL_INTERVAL_MIN,
+# grow by POLL_BACKOFF after each poll without progress up to POLL_INTERVAL_MAX, and
+# reset as soon as the job moves again
+POLL_INTERVAL_MIN = 1.0
+POLL_INTERVAL_MAX = 10.0
+POLL_BACKOFF = 1.5
+
+# Job states after which a job no longer changes
+FINISHED_STATUSES = ("completed", "error", "cancelled")
+
+# Gradio queue: handlers running at once per event, and requests allowed to wait
+GRADIO_CONCURRENCY_LIMIT = int(os.getenv("GRADIO_CONCURRENCY_LIMIT", "8"))
+GRADIO_QUEUE_MAX_SIZE = int(os.getenv("GRADIO_QUEUE_MAX_SIZE", "64"))
+
+# Jobs whose result pages are kept in the shared client-side cache
+RESULTS_CACHE_JOBS = 50
+
+def new_session_state():
+    """Per-browser-session job state (each tab tracks its own job and page)"""
+    return {
+        "job_id": None,
+        "job_status": "idle",  # idle, processing, completed, error
+        "current_page": 1,
+        # Latest /job-summary response for the session's job
+        "job_summary": None,
+        # Polling state: current interval, last progress seen, and the rows the table currently shows
+        "poll_interval": POLL_INTERVAL_MIN,
+        "last_progress": None,
+        "rendered_rows": None,
+    }
+
+# Client-side result pages shared by all sessions (results are per job, not per user):
+# job_id -> {"last_updated": ..., "pages": {page number: rows}}, least recently used first
+results_cache = OrderedDict()
+results_cache_lock = threading.Lock()
 
 # Custom CSS for styling the app to match the extension
 custom_css = """
@@ -198,10 +234,8 @@ th {
 }
 """
 
-def start_job():
+def start_job(state):
     """Start a new job on the server"""
-    global job_id, job_status
-    
     try:
         # Create a new job
         response = requests.post(
@@ -211,199 +245,138 @@ def start_job():
         )
         
         if response.status_code != 200:
-            job_status = "error"
-            return f"Error starting job: HTTP {response.status_code}"
+            state["job_status"] = "error"
+            return f"Error starting job: HTTP {response.status_code}", state
         
         # Get job ID from response
         data = response.json()
         job_id = data.get("job_id")
         
         if not job_id:
-            job_status = "error"
-            return "Error: No job ID returned from server"
+            state["job_status"] = "error"
+            return "Error: No job ID returned from server", state
         
-        job_status = "processing"
-        return f"Job started with ID: {job_id}"
+        state.update(job_id=job_id, job_status="processing", job_summary=None, current_page=1, rendered_rows=None)
+        return f"Job started with ID: {job_id}", state
     
     except Exception as e:
-        job_status = "error"
-        return f"Error: {str(e)}"
+        state["job_status"] = "error"
+        return f"Error: {str(e)}", state
 
-def get_job_status():
-    """Get the current status of the job"""
-    global job_id, job_status
-    
+def sync_results_cache(summary):
+    """Point the job's cached pages at the summary's last_updated, dropping pages it may have changed"""
+    with results_cache_lock:
+        entry = results_cache.get(summary["job_id"])
+        if entry is not None and entry["last_updated"] == summary["last_updated"]:
+            results_cache.move_to_end(summary["job_id"])
+            return
+        
+        # Results are only ever appended, so full pages stay valid; only the last partial page can grow
+        pages = {} if entry is None else {
+            page: rows for page, rows in entry["pages"].items() if len(rows) == ITEMS_PER_PAGE
+        }
+        results_cache[summary["job_id"]] = {"last_updated": summary["last_updated"], "pages": pages}
+        results_cache.move_to_end(summary["job_id"])
+        while len(results_cache) > RESULTS_CACHE_JOBS:
+            results_cache.popitem(last=False)
+
+def get_job_status(state, use_cache=False):
+    """Get the current status of the job (with use_cache, a finished job's summary is not re-fetched)"""
+    job_id = state["job_id"]
     if not job_id:
         return "No job has been started"
     
     try:
-        response = requests.get(
-            f"{API_BASE_URL}/job-status/{job_id}",
-            headers={'accept': 'application/json'}
-        )
-        
-        if response.status_code != 200:
-            return f"Error checking job status: HTTP {response.status_code}"
+        summary = state["job_summary"]
+        cached = summary is not None and summary.get("job_id") == job_id
+        if not (use_cache and cached and summary.get("status") in FINISHED_STATUSES):
+            # Summary only: the results are fetched page by page from /job-results
+            response = requests.get(
+                f"{API_BASE_URL}/job-summary/{job_id}",
+                headers={'accept': 'application/json'}
+            )
+            
+            if response.status_code != 200:
+                return f"Error checking job status: HTTP {response.status_code}"
+            
+            summary = state["job_summary"] = response.json()
+            sync_results_cache(summary)
         
-        data = response.json()
+        data = summary
         status = data.get("status", "unknown")
         message = data.get("message", "")
         total_processed = data.get("total_leads_processed", 0)
         total_found = data.get("total_leads_found", 0)
         
-        job_status = status
+        state["job_status"] = status
         
         return f"Status: {status}\nMessage: {message}\nProcessed: {total_processed}\nFound: {total_found}"
     
     except Exception as e:
         return f"Error checking status: {str(e)}"
 
-def escape_html(text):
-    """Safely escape HTML special characters"""
-    if not isinstance(text, str):
-        return ''
-    return (text
-        .replace('&', '&amp;')
-        .replace('<', '&lt;')
-        .replace('>', '&gt;')
-        .replace('"', '&quot;')
-        .replace("'", '&#039;'))
-
-def create_table_html(results, page=1):
-    """Create HTML table with icon buttons for copying and opening links"""
-    if not results:
+def create_table_html(page_data):
+    """Create HTML table with icon buttons for copying and opening links for one page of results"""
+    if not page_data:
         return "<div>No results available yet</div>"
-    
-    # Calculate pagination
-    total_items = len(results)
-    total_pages = (total_items + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
+    return render_table(page_data)
+
+def get_total_pages(state):
+    """Number of result pages according to the session's latest job summary"""
+    summary = state["job_summary"]
+    if summary is None or summary.get("job_id") != state["job_id"]:
+        return 0
+    total_items = summary.get("total_leads_found", 0)
+    return (total_items + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
+
+def get_page_rows(job_id, page):
+    """Rows of one results page, from the cache or a single /job-results request"""
+    with results_cache_lock:
+        entry = results_cache.get(job_id)
+        rows = entry["pages"].get(page) if entry is not None else None
+    if rows is None:
+        response = requests.get(
+            f"{API_BASE_URL}/job-results/{job_id}",
+            params={"offset": (page - 1) * ITEMS_PER_PAGE, "limit": ITEMS_PER_PAGE},
+            headers={'accept': 'application/json'}
+        )
+        response.raise_for_status()
+        rows = response.json().get("results", [])
+        with results_cache_lock:
+            if job_id in results_cache:
+                results_cache[job_id]["pages"][page] = rows
+    return rows
+
+def get_page_bounds(state, page):
+    """Clamp page to the known results and return (page, total_pages, start_idx, end_idx, total_items)"""
+    total_pages = get_total_pages(state)
+    total_items = state["job_summary"].get("total_leads_found", 0) if total_pages else 0
     page = max(1, min(page, total_pages))
-    
     start_idx = (page - 1) * ITEMS_PER_PAGE
     end_idx = min(start_idx + ITEMS_PER_PAGE, total_items)
-    
-    # Get the current page of data
-    page_data = results[start_idx:end_idx]
-    
-    # Create the HTML table
-    table_html = "<table>"
-    
-    # Table header
-    table_html += "<thead><tr>"
-    table_html += "<th class='col-name'>Name</th>"
-    table_html += "<th class='col-linkedin'>LinkedIn</th>"
-    table_html += "<th class='col-message'>Personalized Message</th>"
-    table_html += "</tr></thead>"
-    
-    # Table body
-    table_html += "<tbody>"
-    
-    if not page_data:
-        # No data available
-        table_html += "<tr><td colspan='3' style='text-align: center;'>No data available yet.</td></tr>"
-    else:
-        # Add rows for each item in the current page
-        for i, item in enumerate(page_data):
-            name = escape_html(item.get("Name", ""))
-            linkedin_url = escape_html(item.get("LinkedIn", ""))
-            input_field = escape_html(item.get("InputField", ""))
-            
-            table_html += "<tr>"
-            
-            # Name column
-            table_html += f"<td class='col-name'>{name}</td>"
-            
-            # LinkedIn URL column with icon buttons
-            table_html += "<td class='col-linkedin'>"
-            if linkedin_url:
-                # Show truncated URL with buttons
-                table_html += f"<div class='linkedin-url'>{linkedin_url}</div>"
-                table_html += "<div class='button-container'>"
-                # Copy URL button
-                table_html += f"<button class='icon-btn icon-copy copy-btn' data-text='{linkedin_url}' title='Copy LinkedIn URL'></button>"
-                # Open URL button
-                table_html += f"<a href='{linkedin_url}' target='_blank'><button class='icon-btn icon-link' title='Open LinkedIn Profile'></button></a>"
-                table_html += "</div>"
-            else:
-                table_html += "-"
-            table_html += "</td>"
-            
-            # Personalized message column with textarea and copy button
-            table_html += "<td class='col-message'>"
-            if input_field:
-                table_html += f"<textarea class='message-textarea' readonly>{input_field}</textarea>"
-                table_html += "<div class='button-container'>"
-                table_html += f"<button class='icon-btn icon-copy copy-btn' data-text='{input_field}' title='Copy Message'></button>"
-                table_html += "</div>"
-            else:
-                table_html += "-"
-            table_html += "</td>"
-            
-            table_html += "</tr>"
-    
-    table_html += "</tbody>"
-    table_html += "</table>"
-    # Use inline onclick handler for copy with fallback
-    copy_inline = ("onclick=\"(async function(btn){"
-        "const text = btn.getAttribute('data-text');"
-        "try { await navigator.clipboard.writeText(text); }"
-        "catch (err) {"
-        "  var textarea = document.createElement('textarea');"
-        "  textarea.value = text;"
-        "  document.body.appendChild(textarea);"
-        "  textarea.select();"
-        "  try { document.execCommand('copy'); } catch(e) {}"
-        "  document.body.removeChild(textarea);"
-        "}"
-        "const orig = btn.innerText;"
-        "btn.classList.add('copied');"
-        "btn.innerText='Copied!';"
-        "setTimeout(()=>{btn.innerText=orig; btn.classList.remove('copied');},1500);"
-        "})(this)\"")
-    # Patch the copy button HTMLs to include the inline handler
-    table_html = table_html.replace(
-        ">\u003cbutton class='icon-btn icon-copy copy-btn' ",
-        f">\u003cbutton class='icon-btn icon-copy copy-btn' {copy_inline} "
-    )
-    return table_html
+    return page, total_pages, start_idx, end_idx, total_items
 
+def format_page_info(page, total_pages, start_idx, end_idx, total_items):
+    return f"Page {page} of {total_pages} (Showing {start_idx+1}-{end_idx} of {total_items} results)"
 
-
-def get_results(page=1):
-    """Get the current results from the job"""
-    global job_id
-    
+def get_results(state):
+    """Get the session's current page of results"""
+    job_id = state["job_id"]
     if not job_id:
         return "No job has been started", ""
     
     try:
-        response = requests.get(
-            f"{API_BASE_URL}/job-status/{job_id}",
-            headers={'accept': 'application/json'}
-        )
-        
-        if response.status_code != 200:
-            return f"Error fetching results: HTTP {response.status_code}", ""
-        
-        data = response.json()
-        results = data.get("results", [])
-        
-        if not results:
-            return "No results available yet", ""
-        
         # Calculate pagination
-        total_items = len(results)
-        total_pages = (total_items + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
-        page = max(1, min(page, total_pages))
-        
-        start_idx = (page - 1) * ITEMS_PER_PAGE
-        end_idx = min(start_idx + ITEMS_PER_PAGE, total_items)
+        page, total_pages, start_idx, end_idx, total_items = get_page_bounds(state, state["current_page"])
+        if not total_pages:
+            return "No results available yet", ""
         
         # Get page info
-        page_info = f"Page {page} of {total_pages} (Showing {start_idx+1}-{end_idx} of {total_items} results)"
+        page_info = format_page_info(page, total_pages, start_idx, end_idx, total_items)
         
         # Create HTML table
-        table_html = create_table_html(results, page)
+        table_html = create_table_html(get_page_rows(job_id, page))
+        state["rendered_rows"] = (job_id, page, start_idx, end_idx)
         
         # Return the page info and table HTML
         return page_info, table_html
@@ -411,12 +384,10 @@ def get_results(page=1):
     except Exception as e:
         return f"Error fetching results: {str(e)}", ""
 
-def update_ui():
-    """Update all UI components"""
-    status_text = get_job_status()
-    page_info, results_html = get_results(current_page)
-    
+def format_status_html(state, status_text):
+    """Wrap the status text in the panel styled for the session's job status"""
     # Determine status class
+    job_status = state["job_status"]
     status_class = "status "
     if job_status == "processing":
         status_class += "status-processing"
@@ -425,37 +396,73 @@ def update_ui():
     elif job_status == "error":
         status_class += "status-error"
     
+    return f"<div class='{status_class}'>{status_text}</div>"
+
+def update_ui(state, use_cache=False):
+    """Update all UI components"""
+    status_text = get_job_status(state, use_cache)
+    page_info, results_html = get_results(state)
+    
     # Create status HTML
-    status_html = f"<div class='{status_class}'>{status_text}</div>"
+    status_html = format_status_html(state, status_text)
     
     # Return the same page_info for both top and bottom pagination
-    return status_html, page_info, results_html, page_info
+    return status_html, page_info, results_html, page_info, state
 
-def on_prev_click():
+def start_polling(state):
+    """Reset the poll interval and switch the timer on for a newly started job"""
+    state["poll_interval"] = POLL_INTERVAL_MIN
+    state["last_progress"] = None
+    active = state["job_id"] is not None and state["job_status"] not in FINISHED_STATUSES
+    return gr.Timer(value=state["poll_interval"], active=active), state
+
+def poll_job(state):
+    """Timer tick: refresh the status panel, and the table only when new rows reach the visible page"""
+    job_id = state["job_id"]
+    if not job_id or state["job_status"] in FINISHED_STATUSES:
+        return gr.skip(), gr.skip(), gr.skip(), gr.skip(), gr.Timer(active=False), state
+    
+    status_text = get_job_status(state)
+    summary = state["job_summary"]
+    
+    # Back off while nothing moves, and poll quickly again once it does
+    progress = None
+    if summary is not None:
+        progress = tuple(summary.get(key) for key in ("status", "message", "total_leads_processed", "total_leads_found"))
+    if progress != state["last_progress"]:
+        state["last_progress"] = progress
+        state["poll_interval"] = POLL_INTERVAL_MIN
+    else:
+        state["poll_interval"] = min(POLL_INTERVAL_MAX, state["poll_interval"] * POLL_BACKOFF)
+    timer = gr.Timer(value=state["poll_interval"], active=state["job_status"] not in FINISHED_STATUSES)
+    
+    status_html = format_status_html(state, status_text)
+    if summary is None or summary.get("job_id") != job_id:
+        return status_html, gr.skip(), gr.skip(), gr.skip(), timer, state
+    
+    # Leave the table alone unless the rows on the visible page changed
+    page, total_pages, start_idx, end_idx, total_items = get_page_bounds(state, state["current_page"])
+    if not total_pages:
+        return status_html, gr.skip(), gr.skip(), gr.skip(), timer, state
+    if state["rendered_rows"] == (job_id, page, start_idx, end_idx):
+        page_info = format_page_info(page, total_pages, start_idx, end_idx, total_items)
+        return status_html, page_info, gr.skip(), page_info, timer, state
+    
+    page_info, results_html = get_results(state)
+    return status_html, page_info, results_html, page_info, timer, state
+
+def on_prev_click(state):
     """Handle previous page button click"""
-    global current_page
-    current_page = max(1, current_page - 1)
-    return update_ui()
+    state["current_page"] = max(1, state["current_page"] - 1)
+    return update_ui(state, use_cache=True)
 
-def on_next_click():
+def on_next_click(state):
     """Handle next page button click"""
-    global current_page
-    # Get job status to check total results
-    try:
-        response = requests.get(f"{API_BASE_URL}/job-status/{job_id}", headers={'accept': 'application/json'})
-        if response.status_code == 200:
-            data = response.json()
-            results = data.get("results", [])
-            total_items = len(results)
-            total_pages = (total_items + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE
-            
-            # Only increment if there are more pages
-            if current_page < total_pages:
-                current_page += 1
-    except:
-        pass  # If there's an error, just don't increment the page
+    # Only increment if there are more pages (per the last summary; no extra request)
+    if state["current_page"] < get_total_pages(state):
+        state["current_page"] += 1
     
-    return update_ui()
+    return update_ui(state, use_cache=True)
 
 def download_csv():
     """Function to return the CSV file for download"""
@@ -464,9 +471,12 @@ def download_csv():
 
 def create_app():
     """Create the Gradio application"""
-    with gr.Blocks(css=custom_css, theme=gr.themes.Soft()) as app:
+    with gr.Blocks(css=custom_css, theme=gr.themes.Soft(), head=COPY_HANDLER_HEAD) as app:
         gr.HTML("<h1>LinkedIn Personalized Messages</h1>")
         
+        # Job, page and polling state of this browser session
+        session_state = gr.State(new_session_state())
+        
         with gr.Row():
             with gr.Column():
                 # Download button at the top left
@@ -484,6 +494,9 @@ def create_app():
                 # Status display
                 status_html = gr.HTML("<div class='status'>Click 'Start Processing' to begin</div>")
                 
+                # Background polling while a job is running (started by 'Start Processing')
+                poll_timer = gr.Timer(POLL_INTERVAL_MIN, active=False)
+                
                 # Top pagination controls
                 with gr.Row():
                     prev_button_top = gr.Button("Previous Page")
@@ -500,48 +513,62 @@ def create_app():
                     next_button_bottom = gr.Button("Next Page")
         
         # Button click handlers
+        ui_outputs = [status_html, page_info, results_html, page_info_bottom, session_state]
         start_button.click(
             fn=start_job,
-            inputs=None,
-            outputs=status_html
+            inputs=session_state,
+            outputs=[status_html, session_state]
         ).then(
             fn=update_ui,
-            inputs=None,
-            outputs=[status_html, page_info, results_html, page_info_bottom]
+            inputs=session_state,
+            outputs=ui_outputs
+        ).then(
+            fn=start_polling,
+            inputs=session_state,
+            outputs=[poll_timer, session_state]
+        )
+        
+        poll_timer.tick(
+            fn=poll_job,
+            inputs=session_state,
+            outputs=[status_html, page_info, results_html, page_info_bottom, poll_timer, session_state]
         )
         
         refresh_button.click(
             fn=update_ui,
-            inputs=None,
-            outputs=[status_html, page_info, results_html, page_info_bottom]
+            inputs=session_state,
+            outputs=ui_outputs
         )
         
         # Top pagination buttons
         prev_button_top.click(
             fn=on_prev_click,
-            inputs=None,
-            outputs=[status_html, page_info, results_html, page_info_bottom]
+            inputs=session_state,
+            outputs=ui_outputs
         )
         
         next_button_top.click(
             fn=on_next_click,
-            inputs=None,
-            outputs=[status_html, page_info, results_html, page_info_bottom]
+            inputs=session_state,
+            outputs=ui_outputs
         )
         
         # Bottom pagination buttons
         prev_button_bottom.click(
             fn=on_prev_click,
-            inputs=None,
-            outputs=[status_html, page_info, results_html, page_info_bottom]
+            inputs=session_state,
+            outputs=ui_outputs
         )
         
         next_button_bottom.click(
             fn=on_next_click,
-            inputs=None,
-            outputs=[status_html, page_info, results_html, page_info_bottom]
+            inputs=session_state,
+            outputs=ui_outputs
         )
     
+    # Bound concurrent handler runs and the number of waiting requests across all sessions
+    app.queue(default_concurrency_limit=GRADIO_CONCURRENCY_LIMIT, max_size=GRADIO_QUEUE_MAX_SIZE)
+    
     return app
 
 if __name__ == "__main__":
@@ -0,0 +1,155 @@
+import argparse
+import time
+
+from table_render import render_row, render_table
+
+# Micro-benchmark of the results table renderer: the previous create_table_html
+# (kept below as the baseline) against table_render.render_table, cold (empty row
+# cache) and warm (every row already memoized), at 10, 100 and 10k rows.
+
+def legacy_escape_html(text):
+    """Safely escape HTML special characters"""
+    if not isinstance(text, str):
+        return ''
+    return (text
+        .replace('&', '&amp;')
+        .replace('<', '&lt;')
+        .replace('>', '&gt;')
+        .replace('"', '&quot;')
+        .replace("'", '&#039;'))
+
+def legacy_create_table_html(page_data):
+    """The previous renderer: += concatenation, chained replaces and a per-button inline handler"""
+    if not page_data:
+        return "<div>No results available yet</div>"
+    
+    # Create the HTML table
+    table_html = "<table>"
+    
+    # Table header
+    table_html += "<thead><tr>"
+    table_html += "<th class='col-name'>Name</th>"
+    table_html += "<th class='col-linkedin'>LinkedIn</th>"
+    table_html += "<th class='col-message'>Personalized Message</th>"
+    table_html += "</tr></thead>"
+    
+    # Table body
+    table_html += "<tbody>"
+    
+    if not page_data:
+        # No data available
+        table_html += "<tr><td colspan='3' style='text-align: center;'>No data available yet.</td></tr>"
+    else:
+        # Add rows for each item in the current page
+        for i, item in enumerate(page_data):
+            name = legacy_escape_html(item.get("Name", ""))
+            linkedin_url = legacy_escape_html(item.get("LinkedIn", ""))
+            input_field = legacy_escape_html(item.get("InputField", ""))
+            
+            table_html += "<tr>"
+            
+            # Name column
+            table_html += f"<td class='col-name'>{name}</td>"
+            
+            # LinkedIn URL column with icon buttons
+            table_html += "<td class='col-linkedin'>"
+            if linkedin_url:
+                # Show truncated URL with buttons
+                table_html += f"<div class='linkedin-url'>{linkedin_url}</div>"
+                table_html += "<div class='button-container'>"
+                # Copy URL button
+                table_html += f"<button class='icon-btn icon-copy copy-btn' data-text='{linkedin_url}' title='Copy LinkedIn URL'></button>"
+                # Open URL button
+                table_html += f"<a href='{linkedin_url}' target='_blank'><button class='icon-btn icon-link' title='Open LinkedIn Profile'></button></a>"
+                table_html += "</div>"
+            else:
+                table_html += "-"
+            table_html += "</td>"
+            
+            # Personalized message column with textarea and copy button
+            table_html += "<td class='col-message'>"
+            if input_field:
+                table_html += f"<textarea class='message-textarea' readonly>{input_field}</textarea>"
+                table_html += "<div class='button-container'>"
+                table_html += f"<button class='icon-btn icon-copy copy-btn' data-text='{input_field}' title='Copy Message'></button>"
+                table_html += "</div>"
+            else:
+                table_html += "-"
+            table_html += "</td>"
+            
+            table_html += "</tr>"
+    
+    table_html += "</tbody>"
+    table_html += "</table>"
+    # Use inline onclick handler for copy with fallback
+    copy_inline = ("onclick=\"(async function(btn){"
+        "const text = btn.getAttribute('data-text');"
+        "try { await navigator.clipboard.writeText(text); }"
+        "catch (err) {"
+        "  var textarea = document.createElement('textarea');"
+        "  textarea.value = text;"
+        "  document.body.appendChild(textarea);"
+        "  textarea.select();"
+        "  try { document.execCommand('copy'); } catch(e) {}"
+        "  document.body.removeChild(textarea);"
+        "}"
+        "const orig = btn.innerText;"
+        "btn.classList.add('copied');"
+        "btn.innerText='Copied!';"
+        "setTimeout(()=>{btn.innerText=orig; btn.classList.remove('copied');},1500);"
+        "})(this)\"")
+    # Patch the copy button HTMLs to include the inline handler
+    table_html = table_html.replace(
+        ">\u003cbutton class='icon-btn icon-copy copy-btn' ",
+        f">\u003cbutton class='icon-btn icon-copy copy-btn' {copy_inline} "
+    )
+    return table_html
+
+def make_rows(count):
+    """Synthetic result rows with characters that need escaping"""
+    return [
+        {
+            "Name": f"First{i} O'Last{i}",
+            "LinkedIn": f"https://www.linkedin.com/in/contact-{i}?ref=a&b=<{i}>",
+            "InputField": f"Hi First{i}, \"quick\" idea for your team & your <growth> plans. " * 3,
+        }
+        for i in range(count)
+    ]
+
+def time_call(func, repeat):
+    """Best wall time of repeat calls, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def time_cold(rows, repeat):
+    """render_table timed with the row cache cleared before every call"""
+    best = float("inf")
+    for _ in range(repeat):
+        render_row.cache_clear()
+        start = time.perf_counter()
+        render_table(rows)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark results table rendering")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 10000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rows':>6} {'legacy':>10} {'cold':>10} {'warm':>10} {'legacy KB':>10} {'new KB':>8}")
+    for size in args.sizes:
+        rows = make_rows(size)
+        legacy = time_call(lambda: legacy_create_table_html(rows), args.repeat)
+        cold = time_cold(rows, args.repeat)
+        render_table(rows)
+        warm = time_call(lambda: render_table(rows), args.repeat)
+        print(f"{size:>6} {legacy * 1000:>8.2f}ms {cold * 1000:>8.2f}ms {warm * 1000:>8.2f}ms "
+              f"{len(legacy_create_table_html(rows)) / 1024:>10.1f} {len(render_table(rows)) / 1024:>8.1f}")
+
+if __name__ == "__main__":
+    main()
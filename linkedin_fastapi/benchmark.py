@@ -0,0 +1,275 @@
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pandas as pd
+import requests
+import uvicorn
+
+from mock_instantly_server import DEFAULT_LEADS_DIR, create_mock_app, load_campaign_leads
+
+logger = logging.getLogger(__name__)
+
+# End-to-end throughput benchmark: runs the mock instantly.ai server and the FastAPI
+# service in-process, then drives /create-job/, /match-leads-go/ and the exporter
+# against the mock and reports leads/sec and job latency percentiles.
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered))))
+    return ordered[min(rank, len(ordered)) - 1]
+
+def start_server(app, port: int) -> uvicorn.Server:
+    """Run an ASGI app with uvicorn in a daemon thread and wait until it accepts requests"""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+def write_fixture_datasets(leads_dir: str, output_dir: str, match_ratio: float = 0.8) -> Dict[str, str]:
+    """Synthesize apollo/personalized message CSVs covering a share of the mock's leads"""
+    leads = [lead for campaign in load_campaign_leads(leads_dir).values() for lead in campaign]
+    matched = leads[: int(len(leads) * match_ratio)]
+
+    apollo_path = os.path.join(output_dir, "apollo-contacts-export.csv")
+    pd.DataFrame({
+        "First Name": [lead.get("first_name") for lead in matched],
+        "Last Name": [lead.get("last_name") for lead in matched],
+        "Email": [lead["email"] for lead in matched],
+        "Person Linkedin Url": [f"https://www.linkedin.com/in/{lead['id']}" for lead in matched],
+    }).to_csv(apollo_path, index=False)
+
+    messages_path = os.path.join(output_dir, "personalized_messages.csv")
+    pd.DataFrame({
+        "Email": [lead["email"] for lead in matched],
+        "Personalized_Message": [f"Hi {lead.get('first_name') or 'there'}, ..." for lead in matched],
+    }).to_csv(messages_path, index=False)
+
+    return {"apollo": apollo_path, "messages": messages_path}
+
+def run_job(api_url: str, campaign_ids: List[str], poll_interval: float, refresh: bool = True) -> Dict[str, Any]:
+    """Create one job and poll it to completion"""
+    start = time.perf_counter()
+    response = requests.post(f"{api_url}/create-job/", json={"campaign_ids": campaign_ids, "refresh": refresh})
+    response.raise_for_status()
+    job_id = response.json()["job_id"]
+
+    while True:
+        status = requests.get(f"{api_url}/job-status/{job_id}").json()
+        if status["status"] in ("completed", "error", "cancelled"):
+            break
+        time.sleep(poll_interval)
+
+    return {
+        "status": status["status"],
+        "seconds": time.perf_counter() - start,
+        "leads": status["total_leads_processed"],
+        "matches": status["total_leads_found"],
+    }
+
+def benchmark_jobs(api_url: str, campaign_ids: List[str], jobs: int, concurrency: int, poll_interval: float, refresh: bool = True) -> Dict[str, Any]:
+    """Run jobs through the /create-job/ pipeline"""
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        runs = list(executor.map(lambda _: run_job(api_url, campaign_ids, poll_interval, refresh), range(jobs)))
+    elapsed = time.perf_counter() - start
+
+    latencies = [run["seconds"] for run in runs]
+    leads = sum(run["leads"] for run in runs)
+    return {
+        "jobs": jobs,
+        "errors": sum(run["status"] != "completed" for run in runs),
+        "leads": leads,
+        "matches": sum(run["matches"] for run in runs),
+        "leads_per_sec": leads / elapsed if elapsed else 0.0,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+        "elapsed": elapsed,
+    }
+
+def benchmark_match_leads_go(api_url: str, campaign_ids: List[str], requests_count: int) -> Dict[str, Any]:
+    """Time sequential /match-leads-go/ requests"""
+    latencies = []
+    matches = 0
+    for _ in range(requests_count):
+        start = time.perf_counter()
+        response = requests.post(f"{api_url}/match-leads-go/", json={"campaign_ids": campaign_ids})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        matches += len(response.json())
+    return {
+        "requests": requests_count,
+        "matches": matches,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99),
+    }
+
+def sample_health(api_url: str, seconds: float, interval: float = 0.02) -> List[float]:
+    """Measure /health latency repeatedly for the given duration"""
+    latencies = []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        requests.get(f"{api_url}/health").raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        time.sleep(interval)
+    return latencies
+
+def benchmark_health_under_load(
+    api_url: str, campaign_ids: List[str], budget: float, baseline_seconds: float = 1.0
+) -> Dict[str, Any]:
+    """Compare /health latency idle and while a large /match-leads-go/ request is running
+
+    The check passes when loaded p99 stays within budget seconds of idle p99, i.e.
+    the /match-leads-go/ work is not blocking the event loop.
+    """
+    idle = sample_health(api_url, baseline_seconds)
+
+    loaded = []
+    done = threading.Event()
+
+    def sample_until_done():
+        while not done.is_set():
+            loaded.extend(sample_health(api_url, 0.2))
+
+    sampler = threading.Thread(target=sample_until_done)
+    sampler.start()
+    try:
+        requests.post(f"{api_url}/match-leads-go/", json={"campaign_ids": campaign_ids}).raise_for_status()
+    finally:
+        done.set()
+        sampler.join()
+
+    idle_p99 = percentile(idle, 99)
+    loaded_p99 = percentile(loaded, 99)
+    return {
+        "idle_p50": percentile(idle, 50),
+        "idle_p99": idle_p99,
+        "loaded_p50": percentile(loaded, 50),
+        "loaded_p99": loaded_p99,
+        "loaded_max": max(loaded, default=0.0),
+        "samples": len(loaded),
+        # No samples means /health never answered while the request ran
+        "passed": bool(loaded) and loaded_p99 <= idle_p99 + budget,
+    }
+
+def benchmark_exporter(campaign_ids: List[str], output_dir: str) -> Dict[str, Any]:
+    """Run the campaign exporter against the mock"""
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "personalised_message_filter" / "campaign_leads_extractor_to_csv"))
+    from export_campaign_leads import process_campaigns
+
+    start = time.perf_counter()
+    results = process_campaigns(campaign_ids, output_dir)
+    elapsed = time.perf_counter() - start
+    leads = sum(result.get("leads_count", 0) for result in results.values())
+    return {
+        "leads": leads,
+        "leads_per_sec": leads / elapsed if elapsed else 0.0,
+        "elapsed": elapsed,
+        "errors": sum(result["status"] == "error" for result in results.values()),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the lead pipeline against a local mock of instantly.ai")
+    parser.add_argument("--leads-dir", default=str(DEFAULT_LEADS_DIR))
+    parser.add_argument("--apollo-csv", help="apollo export to match against (synthesized when omitted)")
+    parser.add_argument("--messages-csv", help="personalized messages CSV (synthesized when omitted)")
+    parser.add_argument("--mock-port", type=int, default=3081)
+    parser.add_argument("--api-port", type=int, default=3071)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--latency-jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--jobs", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=1, help="Jobs in flight at once")
+    parser.add_argument("--match-requests", type=int, default=3)
+    parser.add_argument("--poll-interval", type=float, default=0.05)
+    parser.add_argument("--reuse", action="store_true", help="Let jobs use the lead store and job coalescing instead of forcing a refresh")
+    parser.add_argument("--skip-exporter", action="store_true")
+    parser.add_argument(
+        "--health-budget-ms", type=float, default=100.0,
+        help="Fail the run if /health p99 under load exceeds its idle p99 by more than this",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    work_dir = tempfile.mkdtemp(prefix="lead-benchmark-")
+
+    # Point the pipeline at the mock and the datasets before the service modules are imported
+    os.environ["INSTANTLY_BASE_URL"] = f"http://127.0.0.1:{args.mock_port}"
+    if args.apollo_csv and args.messages_csv:
+        datasets = {"apollo": args.apollo_csv, "messages": args.messages_csv}
+    else:
+        datasets = write_fixture_datasets(args.leads_dir, work_dir)
+    os.environ["APOLLO_CSV_PATH"] = datasets["apollo"]
+    os.environ["PERSONALIZED_MESSAGES_CSV_PATH"] = datasets["messages"]
+    os.environ["JOB_STORE_PATH"] = os.path.join(work_dir, "jobs.sqlite3")
+    os.environ["LEAD_STORE_PATH"] = os.path.join(work_dir, "lead_store.sqlite3")
+
+    mock_app = create_mock_app(
+        leads_dir=args.leads_dir,
+        page_size=args.page_size,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=0,
+    )
+    start_server(mock_app, args.mock_port)
+    campaign_ids = sorted(load_campaign_leads(args.leads_dir))
+
+    import linkedin_fastapi
+    from instantly_client import get_client
+    start_server(linkedin_fastapi.app, args.api_port)
+    api_url = f"http://127.0.0.1:{args.api_port}"
+
+    print(f"Campaigns: {len(campaign_ids)}, upstream latency {args.latency * 1000:.0f} ms, "
+          f"error rate {args.error_rate:.0%}, 429 rate {args.throttle_rate:.0%}")
+    print("=" * 50)
+
+    jobs = benchmark_jobs(api_url, campaign_ids, args.jobs, args.concurrency, args.poll_interval, refresh=not args.reuse)
+    print(f"/create-job/     {jobs['jobs']} jobs ({jobs['errors']} errors), {jobs['leads']} leads, "
+          f"{jobs['leads_per_sec']:.0f} leads/sec, p50 {jobs['p50']:.2f}s, p99 {jobs['p99']:.2f}s")
+
+    if args.match_requests:
+        match = benchmark_match_leads_go(api_url, campaign_ids, args.match_requests)
+        print(f"/match-leads-go/ {match['requests']} requests, {match['matches']} matches, "
+              f"p50 {match['p50']:.2f}s, p99 {match['p99']:.2f}s")
+
+    health = benchmark_health_under_load(api_url, campaign_ids, args.health_budget_ms / 1000)
+    print(f"/health          idle p50 {health['idle_p50'] * 1000:.1f} ms, p99 {health['idle_p99'] * 1000:.1f} ms; "
+          f"during /match-leads-go/ p50 {health['loaded_p50'] * 1000:.1f} ms, p99 {health['loaded_p99'] * 1000:.1f} ms, "
+          f"max {health['loaded_max'] * 1000:.1f} ms ({health['samples']} samples) "
+          f"[{'ok' if health['passed'] else 'FAIL'}]")
+
+    if not args.skip_exporter:
+        export = benchmark_exporter(campaign_ids, os.path.join(work_dir, "exports"))
+        print(f"exporter         {export['leads']} leads ({export['errors']} errors), "
+              f"{export['leads_per_sec']:.0f} leads/sec in {export['elapsed']:.2f}s")
+
+    stats = get_client().stats()
+    print("=" * 50)
+    print(f"Upstream: {stats['requests']} requests, {stats['retries']} retries, {stats['throttled']} throttled, "
+          f"{stats['connections_opened']} connections, avg {stats['avg_seconds'] * 1000:.0f} ms")
+
+    if not health["passed"]:
+        print(f"FAIL: /health p99 under load exceeded idle p99 by more than {args.health_budget_ms:.0f} ms "
+              f"(the event loop was blocked)")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+import json
+from typing import Any
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, fall back to the standard library encoder
+    orjson = None
+
+def dumps_bytes(obj: Any) -> bytes:
+    """Encode obj as compact UTF-8 JSON"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def dumps(obj: Any) -> str:
+    """Encode obj as a compact JSON string"""
+    return dumps_bytes(obj).decode("utf-8")
+
+class FastJSONResponse(Response):
+    """JSON response for payloads that are already in their final shape
+
+    Returning it from an endpoint skips response_model validation and FastAPI's
+    jsonable_encoder, so only plain JSON types (dicts, lists, str, numbers, None)
+    may be passed in. Pre-encoded bytes are sent as they are.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps_bytes(content)
@@ -0,0 +1,324 @@
+import logging
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import Counter, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Upstream configuration (override with environment variables)
+INSTANTLY_BASE_URL = os.getenv("INSTANTLY_BASE_URL", "https://api.instantly.ai")
+INSTANTLY_API_KEY = os.getenv(
+    "INSTANTLY_API_KEY",
+    "NzFhYjkxN2ItNTlhYy00MTUzLWI2NzUtN2IwMGIzODhlOTI1Ok5yTXFzcGV4WVFNYw==",
+)
+INSTANTLY_CONNECT_TIMEOUT = float(os.getenv("INSTANTLY_CONNECT_TIMEOUT", "5"))
+INSTANTLY_READ_TIMEOUT = float(os.getenv("INSTANTLY_READ_TIMEOUT", "30"))
+# Number of host pools to cache, and keep-alive connections kept per host
+INSTANTLY_POOL_CONNECTIONS = int(os.getenv("INSTANTLY_POOL_CONNECTIONS", "4"))
+INSTANTLY_POOL_MAXSIZE = int(os.getenv("INSTANTLY_POOL_MAXSIZE", "16"))
+
+# Shared rate limit: starting requests/sec, the range it adapts within, and the burst size
+INSTANTLY_RATE_LIMIT = float(os.getenv("INSTANTLY_RATE_LIMIT", "5"))
+INSTANTLY_RATE_LIMIT_MIN = float(os.getenv("INSTANTLY_RATE_LIMIT_MIN", "0.5"))
+INSTANTLY_RATE_LIMIT_MAX = float(os.getenv("INSTANTLY_RATE_LIMIT_MAX", "20"))
+INSTANTLY_RATE_BURST = float(os.getenv("INSTANTLY_RATE_BURST", "5"))
+# Retries on 429/5xx/connection errors with jittered exponential backoff
+INSTANTLY_MAX_RETRIES = int(os.getenv("INSTANTLY_MAX_RETRIES", "5"))
+INSTANTLY_BACKOFF_BASE = float(os.getenv("INSTANTLY_BACKOFF_BASE", "0.5"))
+INSTANTLY_BACKOFF_MAX = float(os.getenv("INSTANTLY_BACKOFF_MAX", "30"))
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+LEADS_LIST_PATH = "/api/v2/leads/list"
+DEFAULT_LEADS_FILTER = "FILTER_VAL_OPENED_NO_REPLY"
+
+# Per-attempt upstream metrics (status is the HTTP code, or "error" when no response arrived)
+UPSTREAM_REQUEST_SECONDS = Histogram(
+    "instantly_request_seconds", "Latency of upstream instantly.ai requests", ["path"]
+)
+UPSTREAM_RESPONSES = Counter(
+    "instantly_responses_total", "Upstream instantly.ai responses by status code", ["path", "status"]
+)
+
+class RequestCancelled(Exception):
+    """Raised when a caller's cancel event is set while a request waits to be sent or retried"""
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delay in seconds or an HTTP date) into seconds"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+class AdaptiveRateLimiter:
+    """Token bucket shared by all upstream calls, adapting its rate to upstream responses
+
+    The rate grows additively on each success and is cut multiplicatively on
+    throttling or server errors. Retry-After pauses every caller until it expires.
+    """
+
+    def __init__(
+        self,
+        rate: float = INSTANTLY_RATE_LIMIT,
+        min_rate: float = INSTANTLY_RATE_LIMIT_MIN,
+        max_rate: float = INSTANTLY_RATE_LIMIT_MAX,
+        burst: float = INSTANTLY_RATE_BURST,
+        increase_step: float = 0.1,
+    ):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.burst = max(1.0, burst)
+        self.increase_step = increase_step
+        self.tokens = self.burst
+        self.blocked_until = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        """Add the tokens earned since the last update"""
+        self.tokens = min(self.burst, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, cancel_event: Optional[threading.Event] = None) -> bool:
+        """Block until a request may be sent; returns False if cancel_event is set first"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                elif self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                else:
+                    wait = (1 - self.tokens) / self.rate
+            if cancel_event is None:
+                time.sleep(wait)
+            elif cancel_event.wait(wait):
+                return False
+
+    def on_success(self):
+        """Additive increase after a successful response"""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self, retry_after: Optional[float] = None, factor: float = 0.5):
+        """Multiplicative decrease, pausing everyone for Retry-After seconds if given"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate * factor)
+            self.tokens = min(self.tokens, 0.0)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, now + retry_after)
+
+    def snapshot(self) -> Dict[str, float]:
+        """Current rate and remaining Retry-After pause"""
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "blocked_for": max(0.0, self.blocked_until - time.monotonic()),
+            }
+
+class InstantlyClient:
+    """Pooled keep-alive HTTP client for the instantly.ai API with latency accounting"""
+
+    def __init__(
+        self,
+        base_url: str = INSTANTLY_BASE_URL,
+        api_key: str = INSTANTLY_API_KEY,
+        connect_timeout: float = INSTANTLY_CONNECT_TIMEOUT,
+        read_timeout: float = INSTANTLY_READ_TIMEOUT,
+        pool_connections: int = INSTANTLY_POOL_CONNECTIONS,
+        pool_maxsize: int = INSTANTLY_POOL_MAXSIZE,
+        rate_limiter: Optional[AdaptiveRateLimiter] = None,
+        max_retries: int = INSTANTLY_MAX_RETRIES,
+        backoff_base: float = INSTANTLY_BACKOFF_BASE,
+        backoff_max: float = INSTANTLY_BACKOFF_MAX,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter()
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        # One session for the whole process so TCP+TLS connections are reused across pages
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self.session = requests.Session()
+        self.session.mount("https://", self.adapter)
+        self.session.mount("http://", self.adapter)
+        self.session.headers.update({
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {api_key}",
+        })
+
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "errors": 0,
+            "retries": 0,
+            "throttled": 0,
+            "connections_opened": 0,
+            "total_seconds": 0.0,
+            "max_seconds": 0.0,
+            "new_connection_requests": 0,
+            "new_connection_seconds": 0.0,
+            "reused_connection_requests": 0,
+            "reused_connection_seconds": 0.0,
+        }
+
+    def _connections_opened(self) -> int:
+        """Total connections opened by the pool so far"""
+        pools = self.adapter.poolmanager.pools
+        return sum(pools[key].num_connections for key in list(pools.keys()))
+
+    def _record(self, seconds: float, new_connections: int, error: bool):
+        """Add one request to the latency statistics"""
+        with self._stats_lock:
+            stats = self._stats
+            stats["requests"] += 1
+            stats["errors"] += int(error)
+            stats["total_seconds"] += seconds
+            stats["max_seconds"] = max(stats["max_seconds"], seconds)
+            # Approximate under concurrency: another thread may have opened the connection
+            if new_connections > 0:
+                stats["connections_opened"] += new_connections
+                stats["new_connection_requests"] += 1
+                stats["new_connection_seconds"] += seconds
+            else:
+                stats["reused_connection_requests"] += 1
+                stats["reused_connection_seconds"] += seconds
+
+    def _send(self, path: str, body: Dict[str, Any]) -> requests.Response:
+        """Send one POST and record its latency"""
+        opened_before = self._connections_opened()
+        start = time.perf_counter()
+        error = True
+        status = "error"
+        try:
+            response = self.session.post(f"{self.base_url}{path}", json=body, timeout=self.timeout)
+            error = response.status_code >= 400
+            status = str(response.status_code)
+            return response
+        finally:
+            seconds = time.perf_counter() - start
+            self._record(seconds, self._connections_opened() - opened_before, error)
+            UPSTREAM_REQUEST_SECONDS.observe(seconds, path=path)
+            UPSTREAM_RESPONSES.inc(path=path, status=status)
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff delay for a retry attempt"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def post(self, path: str, body: Dict[str, Any], cancel_event: Optional[threading.Event] = None) -> requests.Response:
+        """POST a JSON body through the shared rate limiter, retrying throttled and failed requests
+
+        Setting cancel_event stops any further attempt, including one waiting on the
+        rate limiter or a retry delay, by raising RequestCancelled.
+        """
+        attempt = 0
+        while True:
+            if not self.rate_limiter.acquire(cancel_event):
+                raise RequestCancelled(f"Request to {path} cancelled")
+            try:
+                response = self._send(path, body)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                logger.warning(f"Upstream request to {path} failed ({e}), retrying in {delay:.2f}s")
+            else:
+                if response.status_code not in RETRY_STATUS_CODES:
+                    # Client errors (bad key, unknown campaign) say nothing about upstream capacity
+                    if response.status_code < 400:
+                        self.rate_limiter.on_success()
+                    return response
+
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                if response.status_code == 429:
+                    with self._stats_lock:
+                        self._stats["throttled"] += 1
+                    self.rate_limiter.on_throttle(retry_after)
+                else:
+                    self.rate_limiter.on_throttle(retry_after, factor=0.8)
+
+                if attempt >= self.max_retries:
+                    return response
+                delay = max(self._backoff(attempt), retry_after or 0.0)
+                logger.warning(f"Upstream returned {response.status_code} for {path}, retrying in {delay:.2f}s")
+
+            with self._stats_lock:
+                self._stats["retries"] += 1
+            attempt += 1
+            if cancel_event is None:
+                time.sleep(delay)
+            elif cancel_event.wait(delay):
+                raise RequestCancelled(f"Request to {path} cancelled")
+
+    def list_leads(
+        self,
+        campaign_id: str,
+        starting_after: Optional[str] = None,
+        lead_filter: str = DEFAULT_LEADS_FILTER,
+        cancel_event: Optional[threading.Event] = None,
+    ) -> Dict[str, Any]:
+        """Fetch a single page of leads for a campaign"""
+        body = {
+            "campaign": campaign_id,
+            "filter": lead_filter,
+        }
+        if starting_after:
+            body["starting_after"] = starting_after
+
+        response = self.post(LEADS_LIST_PATH, body, cancel_event)
+        response.raise_for_status()
+        return response.json()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of the request latency statistics"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+
+        def average(total: float, count: int) -> float:
+            return total / count if count else 0.0
+
+        stats["avg_seconds"] = average(stats["total_seconds"], stats["requests"])
+        stats["avg_new_connection_seconds"] = average(stats["new_connection_seconds"], stats["new_connection_requests"])
+        stats["avg_reused_connection_seconds"] = average(stats["reused_connection_seconds"], stats["reused_connection_requests"])
+        stats["connection_reuse_ratio"] = average(stats["reused_connection_requests"], stats["requests"])
+        stats["rate_limiter"] = self.rate_limiter.snapshot()
+        return stats
+
+# Shared client instance for the process
+_client = None
+_client_lock = threading.Lock()
+
+def get_client() -> InstantlyClient:
+    """Return the process-wide InstantlyClient, creating it on first use"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = InstantlyClient()
+                logger.info(f"Created instantly.ai client for {_client.base_url}")
+    return _client
@@ -0,0 +1,82 @@
+import heapq
+import itertools
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class JobScheduler:
+    """Fixed pool of worker threads draining a priority queue of jobs
+
+    Lower priority values run first; jobs with equal priority run in submission
+    order. Every job gets a cancel event that is passed to its target as the
+    cancel_event keyword argument.
+    """
+
+    def __init__(self, workers: int, name: str = "job-worker"):
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._running = set()
+
+        for i in range(max(1, workers)):
+            threading.Thread(target=self._worker, daemon=True, name=f"{name}-{i}").start()
+
+    def submit(self, job_id: str, priority: int, target: Callable[..., Any], *args: Any) -> threading.Event:
+        """Queue a job and return its cancel event"""
+        cancel_event = threading.Event()
+        with self._condition:
+            self._cancel_events[job_id] = cancel_event
+            heapq.heappush(self._queue, (priority, next(self._sequence), job_id, target, args))
+            self._condition.notify()
+        return cancel_event
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """Cancel a job; returns "queued" or "running" for where it was, or None if unknown"""
+        with self._condition:
+            cancel_event = self._cancel_events.get(job_id)
+            if cancel_event is None:
+                return None
+            cancel_event.set()
+            if job_id in self._running:
+                return "running"
+
+            # Remove it from the queue right away so it no longer counts towards positions
+            self._queue = [item for item in self._queue if item[2] != job_id]
+            heapq.heapify(self._queue)
+            del self._cancel_events[job_id]
+            return "queued"
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """1-based position of a queued job, or None if it is not waiting"""
+        with self._condition:
+            for position, item in enumerate(sorted(self._queue), start=1):
+                if item[2] == job_id:
+                    return position
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        """Number of queued and running jobs"""
+        with self._condition:
+            return {"queued": len(self._queue), "running": len(self._running)}
+
+    def _worker(self):
+        """Run queued jobs one at a time"""
+        while True:
+            with self._condition:
+                while not self._queue:
+                    self._condition.wait()
+                _, _, job_id, target, args = heapq.heappop(self._queue)
+                cancel_event = self._cancel_events[job_id]
+                self._running.add(job_id)
+
+            try:
+                target(*args, cancel_event=cancel_event)
+            except Exception as e:
+                logger.error(f"Unhandled error in job {job_id}: {str(e)}")
+            finally:
+                with self._condition:
+                    self._running.discard(job_id)
+                    self._cancel_events.pop(job_id, None)
@@ -0,0 +1,193 @@
+import json
+import logging
+from abc import ABC, abstractmethod
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Job states after which a job no longer changes
+FINISHED_STATUSES = ("completed", "error", "cancelled")
+
+def job_metadata(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Everything persisted about a job except its results and in-memory bookkeeping keys"""
+    return {key: value for key, value in job.items() if key != "results" and not key.startswith("_")}
+
+class JobStore(ABC):
+    """Persists job metadata and results outside the in-memory jobs dict
+
+    A backend must implement every method; an incomplete one fails when it is constructed.
+    """
+
+    @abstractmethod
+    def save_job(self, job: Dict[str, Any]):
+        """Insert or replace a job's metadata"""
+
+    @abstractmethod
+    def append_results(self, job_id: str, offset: int, rows: List[Dict[str, Any]]):
+        """Store result rows starting at position offset"""
+
+    @abstractmethod
+    def load_job(self, job_id: str, include_results: bool = True) -> Optional[Dict[str, Any]]:
+        """Return the job's metadata (with its full results list unless include_results is False), or None"""
+
+    @abstractmethod
+    def load_results(self, job_id: str, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return a slice of the job's results"""
+
+    @abstractmethod
+    def evict_expired(self, ttl: float) -> int:
+        """Delete jobs finished more than ttl seconds ago and return how many were removed"""
+
+    @abstractmethod
+    def mark_interrupted(self) -> int:
+        """Fail jobs that were still running when the process stopped"""
+
+class MemoryJobStore(JobStore):
+    """Job store kept in process memory (nothing survives a restart)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._results = {}
+        self._finished_at = {}
+
+    def save_job(self, job: Dict[str, Any]):
+        metadata = json.loads(json.dumps(job_metadata(job)))
+        with self._lock:
+            self._jobs[metadata["job_id"]] = metadata
+            self._results.setdefault(metadata["job_id"], [])
+            if metadata["status"] in FINISHED_STATUSES:
+                self._finished_at.setdefault(metadata["job_id"], time.time())
+
+    def append_results(self, job_id: str, offset: int, rows: List[Dict[str, Any]]):
+        with self._lock:
+            results = self._results.setdefault(job_id, [])
+            results[offset:offset + len(rows)] = [dict(row) for row in rows]
+
+    def load_job(self, job_id: str, include_results: bool = True) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if job_id not in self._jobs:
+                return None
+            job = dict(self._jobs[job_id])
+            if include_results:
+                job["results"] = list(self._results.get(job_id, []))
+        return job
+
+    def load_results(self, job_id: str, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            results = self._results.get(job_id, [])
+            return results[offset:] if limit is None else results[offset:offset + limit]
+
+    def evict_expired(self, ttl: float) -> int:
+        cutoff = time.time() - ttl
+        with self._lock:
+            expired = [job_id for job_id, finished_at in self._finished_at.items() if finished_at < cutoff]
+            for job_id in expired:
+                self._jobs.pop(job_id, None)
+                self._results.pop(job_id, None)
+                self._finished_at.pop(job_id, None)
+        return len(expired)
+
+    def mark_interrupted(self) -> int:
+        return 0
+
+class SqliteJobStore(JobStore):
+    """Embedded on-disk job store, so jobs and their results survive restarts"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                job_id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                finished_at REAL,
+                metadata TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_finished_at ON jobs (finished_at);
+            CREATE TABLE IF NOT EXISTS job_results (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                row TEXT NOT NULL,
+                PRIMARY KEY (job_id, seq)
+            );
+        """)
+        self._conn.commit()
+
+    def save_job(self, job: Dict[str, Any]):
+        metadata = job_metadata(job)
+        finished_at = time.time() if metadata["status"] in FINISHED_STATUSES else None
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (job_id, status, finished_at, metadata) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (job_id) DO UPDATE SET status = excluded.status, "
+                "finished_at = COALESCE(jobs.finished_at, excluded.finished_at), metadata = excluded.metadata",
+                (metadata["job_id"], metadata["status"], finished_at, json.dumps(metadata)),
+            )
+
+    def append_results(self, job_id: str, offset: int, rows: List[Dict[str, Any]]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO job_results (job_id, seq, row) VALUES (?, ?, ?)",
+                [(job_id, offset + i, json.dumps(row)) for i, row in enumerate(rows)],
+            )
+
+    def load_job(self, job_id: str, include_results: bool = True) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT metadata FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = json.loads(row[0])
+        if include_results:
+            job["results"] = self.load_results(job_id)
+        return job
+
+    def load_results(self, job_id: str, offset: int = 0, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT row FROM job_results WHERE job_id = ? AND seq >= ? ORDER BY seq LIMIT ?",
+                (job_id, offset, -1 if limit is None else limit),
+            ).fetchall()
+        return [json.loads(row) for (row,) in rows]
+
+    def evict_expired(self, ttl: float) -> int:
+        cutoff = time.time() - ttl
+        with self._lock, self._conn:
+            expired = [job_id for (job_id,) in self._conn.execute(
+                "SELECT job_id FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?", (cutoff,)
+            ).fetchall()]
+            for job_id in expired:
+                self._conn.execute("DELETE FROM job_results WHERE job_id = ?", (job_id,))
+                self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+        return len(expired)
+
+    def mark_interrupted(self) -> int:
+        now = time.time()
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"SELECT job_id, metadata FROM jobs WHERE status NOT IN ({','.join('?' * len(FINISHED_STATUSES))})",
+                FINISHED_STATUSES,
+            ).fetchall()
+            for job_id, metadata in rows:
+                job = json.loads(metadata)
+                job["status"] = "error"
+                job["message"] = "Job was interrupted by a server restart"
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ?, metadata = ? WHERE job_id = ?",
+                    (job["status"], now, json.dumps(job), job_id),
+                )
+        return len(rows)
+
+def create_job_store(backend: str, path: str) -> JobStore:
+    """Build the job store selected by JOB_STORE_BACKEND"""
+    if backend == "sqlite":
+        return SqliteJobStore(path)
+    if backend == "memory":
+        return MemoryJobStore()
+    raise ValueError(f"Unknown job store backend '{backend}' (expected 'sqlite' or 'memory')")
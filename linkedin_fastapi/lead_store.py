@@ -0,0 +1,148 @@
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    campaign TEXT NOT NULL,
+    id TEXT NOT NULL,
+    email TEXT,
+    timestamp_updated TEXT,
+    sync_id INTEGER NOT NULL,
+    PRIMARY KEY (campaign, id)
+);
+CREATE INDEX IF NOT EXISTS leads_campaign_email ON leads (campaign, email);
+CREATE TABLE IF NOT EXISTS campaign_sync (
+    campaign TEXT PRIMARY KEY,
+    sync_id INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL,
+    lead_count INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+class LeadStore:
+    """On-disk SQLite copy of each campaign's leads, kept current by incremental syncs
+
+    A sync upserts every page it sees under a new sync id, counts the leads whose
+    timestamp_updated changed, and on completion deletes leads that no longer
+    appear upstream. Until a campaign's last sync is older than the caller's
+    max age, its leads can be read back without touching the API.
+
+    Only one sync per campaign runs at a time: begin_sync returns None while
+    another is in flight, and a sync that has been superseded never deletes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # campaign -> sync id of the sync currently in flight
+        self._syncing: Dict[str, int] = {}
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def begin_sync(self, campaign_id: str) -> Optional[int]:
+        """Start a new sync for a campaign and return its sync id, or None if one is already running"""
+        with self._lock, self._conn:
+            if campaign_id in self._syncing:
+                return None
+            self._conn.execute(
+                "INSERT INTO campaign_sync (campaign) VALUES (?) ON CONFLICT (campaign) DO NOTHING",
+                (campaign_id,),
+            )
+            self._conn.execute("UPDATE campaign_sync SET sync_id = sync_id + 1 WHERE campaign = ?", (campaign_id,))
+            (sync_id,) = self._conn.execute(
+                "SELECT sync_id FROM campaign_sync WHERE campaign = ?", (campaign_id,)
+            ).fetchone()
+            self._syncing[campaign_id] = sync_id
+        return sync_id
+
+    def upsert_page(self, campaign_id: str, leads: List[Dict[str, Any]], sync_id: int) -> int:
+        """Store one page of leads and return how many were new or updated"""
+        rows = [
+            (campaign_id, lead["id"], lead.get("email"), lead.get("timestamp_updated"), sync_id)
+            for lead in leads if lead.get("id")
+        ]
+        if not rows:
+            return 0
+
+        with self._lock, self._conn:
+            placeholders = ",".join("?" * len(rows))
+            known = dict(self._conn.execute(
+                f"SELECT id, timestamp_updated FROM leads WHERE campaign = ? AND id IN ({placeholders})",
+                [campaign_id] + [row[1] for row in rows],
+            ).fetchall())
+            self._conn.executemany(
+                "INSERT INTO leads (campaign, id, email, timestamp_updated, sync_id) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (campaign, id) DO UPDATE SET "
+                "email = excluded.email, timestamp_updated = excluded.timestamp_updated, sync_id = excluded.sync_id",
+                rows,
+            )
+        return sum(1 for row in rows if row[1] not in known or known[row[1]] != row[3])
+
+    def finish_sync(self, campaign_id: str, sync_id: int) -> int:
+        """Mark a completed sync, dropping leads not seen in it; returns the number removed"""
+        with self._lock, self._conn:
+            if self._syncing.get(campaign_id) == sync_id:
+                del self._syncing[campaign_id]
+            (current,) = self._conn.execute(
+                "SELECT sync_id FROM campaign_sync WHERE campaign = ?", (campaign_id,)
+            ).fetchone()
+            if current != sync_id:
+                # A newer sync has started since; its pages are not all in yet
+                logger.warning(f"Sync {sync_id} of campaign {campaign_id} was superseded by sync {current}, keeping leads")
+                return 0
+            removed = self._conn.execute(
+                "DELETE FROM leads WHERE campaign = ? AND sync_id <> ?", (campaign_id, sync_id)
+            ).rowcount
+            (lead_count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM leads WHERE campaign = ?", (campaign_id,)
+            ).fetchone()
+            self._conn.execute(
+                "UPDATE campaign_sync SET synced_at = ?, lead_count = ? WHERE campaign = ? AND sync_id = ?",
+                (time.time(), lead_count, campaign_id, sync_id),
+            )
+        return removed
+
+    def abort_sync(self, campaign_id: str, sync_id: int):
+        """Give up on an unfinished sync without deleting anything, so a later one can start"""
+        with self._lock:
+            if self._syncing.get(campaign_id) == sync_id:
+                del self._syncing[campaign_id]
+
+    def last_synced(self, campaign_id: str) -> Optional[float]:
+        """Unix time of the campaign's last completed sync, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT synced_at FROM campaign_sync WHERE campaign = ?", (campaign_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_fresh(self, campaign_id: str, max_age: float) -> bool:
+        """Whether the campaign was fully synced within the last max_age seconds"""
+        synced_at = self.last_synced(campaign_id)
+        return synced_at is not None and time.time() - synced_at <= max_age
+
+    def iter_emails(self, campaign_id: str, batch_size: int = 1000) -> Iterator[List[str]]:
+        """Yield the campaign's stored lead emails in batches"""
+        last_id = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    "SELECT id, email FROM leads WHERE campaign = ? AND id > ? ORDER BY id LIMIT ?",
+                    (campaign_id, last_id, batch_size),
+                ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            yield [email for _, email in rows if email]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
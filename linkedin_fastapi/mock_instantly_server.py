@@ -0,0 +1,129 @@
+import argparse
+import asyncio
+import bisect
+import logging
+import os
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Local stand-in for the instantly.ai /api/v2/leads/list endpoint, serving the campaign
+# exports under campaign_leads/ with the real cursor pagination plus injected latency,
+# errors and 429s. Point the clients at it with INSTANTLY_BASE_URL=http://localhost:3080
+
+DEFAULT_LEADS_DIR = (
+    Path(__file__).resolve().parent.parent
+    / "personalised_message_filter" / "campaign_leads_extractor_to_csv" / "campaign_leads"
+)
+
+def load_campaign_leads(leads_dir: str) -> Dict[str, List[Dict[str, Any]]]:
+    """Load every campaign export in leads_dir, grouped by campaign and sorted by lead id"""
+    campaigns = {}
+    for csv_path in sorted(Path(leads_dir).glob("*.csv")):
+        df = pd.read_csv(csv_path, dtype=str)
+        df = df.astype(object).where(df.notna(), None)
+        for lead in df.to_dict(orient="records"):
+            campaigns.setdefault(lead["campaign"], []).append(lead)
+
+    for leads in campaigns.values():
+        leads.sort(key=lambda lead: lead["id"])
+    logger.info(f"Loaded {sum(len(leads) for leads in campaigns.values())} leads for {len(campaigns)} campaigns")
+    return campaigns
+
+def create_mock_app(
+    leads_dir: str = str(DEFAULT_LEADS_DIR),
+    page_size: int = 100,
+    latency: float = 0.1,
+    latency_jitter: float = 0.05,
+    error_rate: float = 0.0,
+    throttle_rate: float = 0.0,
+    retry_after: float = 1.0,
+    seed: Optional[int] = None,
+) -> FastAPI:
+    """Build the mock API app"""
+    campaigns = load_campaign_leads(leads_dir)
+    campaign_ids = {campaign_id: [lead["id"] for lead in leads] for campaign_id, leads in campaigns.items()}
+    rng = random.Random(seed)
+    stats = {"requests": 0, "pages": 0, "errors": 0, "throttled": 0}
+
+    app = FastAPI()
+
+    @app.post("/api/v2/leads/list")
+    async def list_leads(request: Request):
+        body = await request.json()
+        stats["requests"] += 1
+
+        # Simulated upstream round trip
+        delay = max(0.0, latency + rng.uniform(-latency_jitter, latency_jitter))
+        if delay:
+            await asyncio.sleep(delay)
+
+        if throttle_rate and rng.random() < throttle_rate:
+            stats["throttled"] += 1
+            return JSONResponse(
+                status_code=429,
+                content={"error": "Too Many Requests"},
+                headers={"Retry-After": f"{retry_after:g}"},
+            )
+        if error_rate and rng.random() < error_rate:
+            stats["errors"] += 1
+            return JSONResponse(status_code=500, content={"error": "Injected server error"})
+
+        campaign_id = body.get("campaign")
+        leads = campaigns.get(campaign_id, [])
+        ids = campaign_ids.get(campaign_id, [])
+        limit = int(body.get("limit") or page_size)
+
+        # The cursor is the id of the last lead of the previous page
+        start = bisect.bisect_right(ids, body["starting_after"]) if body.get("starting_after") else 0
+        items = leads[start:start + limit]
+        has_more = start + limit < len(leads)
+
+        stats["pages"] += 1
+        return {
+            "items": items,
+            "next_starting_after": items[-1]["id"] if items and has_more else None,
+        }
+
+    @app.get("/mock/stats")
+    async def mock_stats():
+        return dict(stats, campaigns={campaign_id: len(leads) for campaign_id, leads in campaigns.items()})
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a local mock of the instantly.ai leads API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=int(os.getenv("MOCK_INSTANTLY_PORT", "3080")))
+    parser.add_argument("--leads-dir", default=str(DEFAULT_LEADS_DIR))
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.1, help="Mean response latency in seconds")
+    parser.add_argument("--latency-jitter", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+    logging.basicConfig(level=logging.INFO)
+    app = create_mock_app(
+        leads_dir=args.leads_dir,
+        page_size=args.page_size,
+        latency=args.latency,
+        latency_jitter=args.latency_jitter,
+        error_rate=args.error_rate,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    uvicorn.run(app, host=args.host, port=args.port)
+
+if __name__ == "__main__":
+    main()
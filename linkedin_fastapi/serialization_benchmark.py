@@ -0,0 +1,78 @@
+import argparse
+import json
+import time
+from typing import Any, Callable, Dict, List
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from fast_json import FastJSONResponse, dumps_bytes, orjson
+
+# Serialization benchmark: compares returning LeadResponse rows through FastAPI's
+# response_model (pydantic validation + jsonable encoding) with the FastJSONResponse
+# path used by /match-leads*, /job-status and /job-results, at several result sizes.
+
+class LeadResponse(BaseModel):
+    Name: str
+    LinkedIn: str
+    InputField: str
+
+def make_rows(count: int) -> List[Dict[str, str]]:
+    """Synthetic matched rows shaped like match_emails() output"""
+    return [
+        {
+            "Name": f"First{i} Last{i}",
+            "LinkedIn": f"https://www.linkedin.com/in/contact-{i}",
+            "InputField": f"Hi First{i}, I noticed your team is hiring for growth roles and wanted to share an idea. " * 2,
+        }
+        for i in range(count)
+    ]
+
+def create_app(rows: List[Dict[str, str]]) -> FastAPI:
+    """Two endpoints returning the same rows through each path"""
+    app = FastAPI()
+
+    @app.get("/response-model", response_model=List[LeadResponse])
+    def response_model_path():
+        return rows
+
+    @app.get("/fast")
+    def fast_path():
+        return FastJSONResponse(dumps_bytes(rows))
+
+    return app
+
+def time_call(func: Callable[[], Any], repeat: int) -> float:
+    """Best wall time of repeat calls, in seconds"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LeadResponse list serialization paths")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 20000, 100000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"Encoder: {'orjson' if orjson is not None else 'json (orjson not installed)'}")
+    print(f"{'rows':>8} {'json.dumps':>12} {'fast encode':>12} {'response_model':>15} {'fast path':>10} {'speedup':>8}")
+    for size in args.sizes:
+        rows = make_rows(size)
+        client = TestClient(create_app(rows))
+
+        # Check both endpoints agree before timing them
+        assert client.get("/response-model").json() == client.get("/fast").json()
+
+        stdlib = time_call(lambda: json.dumps(rows), args.repeat)
+        fast = time_call(lambda: dumps_bytes(rows), args.repeat)
+        model_path = time_call(lambda: client.get("/response-model"), args.repeat)
+        fast_path = time_call(lambda: client.get("/fast"), args.repeat)
+        print(f"{size:>8} {stdlib * 1000:>10.1f}ms {fast * 1000:>10.1f}ms {model_path * 1000:>13.1f}ms "
+              f"{fast_path * 1000:>8.1f}ms {model_path / fast_path:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional, fall back to parsing the CSV
+    pa = None
+    feather = None
+
+logger = logging.getLogger(__name__)
+
+# Snapshot files live next to the source CSV
+SNAPSHOT_SUFFIX = ".snapshot.feather"
+META_SUFFIX = ".snapshot.json"
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Arrow-backed strings keep each column in one contiguous buffer instead of a Python str per cell
+COMPACT_STRING_DTYPE = pd.StringDtype("pyarrow") if pa is not None else None
+
+def file_sha256(path: str) -> str:
+    """Hash a file in 1 MB blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _read_meta(meta_path: str) -> Optional[Dict[str, Any]]:
+    """Read the snapshot metadata, or None if it is missing or unreadable"""
+    try:
+        with open(meta_path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_meta(meta_path: str, meta: Dict[str, Any]):
+    """Atomically write the snapshot metadata"""
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp_path, meta_path)
+
+def _snapshot_is_valid(csv_path: str, meta: Optional[Dict[str, Any]], columns: List[str]) -> bool:
+    """Check the snapshot metadata against the current source file"""
+    if not meta or meta.get("version") != SNAPSHOT_FORMAT_VERSION or meta.get("columns") != columns:
+        return False
+
+    stat = os.stat(csv_path)
+    if meta.get("size") != stat.st_size:
+        return False
+    if meta.get("mtime_ns") == stat.st_mtime_ns:
+        return True
+
+    # Same size but a new mtime (e.g. the file was copied or touched): compare content hashes
+    if meta.get("sha256") != file_sha256(csv_path):
+        return False
+    meta["mtime_ns"] = stat.st_mtime_ns
+    try:
+        _write_meta(csv_path + META_SUFFIX, meta)
+    except OSError as e:
+        logger.warning(f"Could not refresh snapshot metadata for {csv_path}: {e}")
+    return True
+
+def _write_snapshot(csv_path: str, df: pd.DataFrame, columns: List[str]):
+    """Write the projected DataFrame as an uncompressed Feather file plus metadata"""
+    stat = os.stat(csv_path)
+    snapshot_path = csv_path + SNAPSHOT_SUFFIX
+    tmp_path = snapshot_path + ".tmp"
+    # Uncompressed so the snapshot can be memory-mapped on load
+    feather.write_feather(df.reset_index(drop=True), tmp_path, compression="uncompressed")
+    os.replace(tmp_path, snapshot_path)
+    _write_meta(csv_path + META_SUFFIX, {
+        "version": SNAPSHOT_FORMAT_VERSION,
+        "columns": columns,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_sha256(csv_path),
+    })
+
+def load_csv_snapshot(csv_path: str, columns: List[str], use_cache: bool = True, compact: bool = True) -> pd.DataFrame:
+    """Load the given columns of a CSV, using a binary snapshot when it is still fresh
+
+    With compact=True (and pyarrow installed) string columns use Arrow-backed storage.
+    """
+    cache_enabled = use_cache and feather is not None
+    snapshot_path = csv_path + SNAPSHOT_SUFFIX
+    string_dtype = COMPACT_STRING_DTYPE if compact and COMPACT_STRING_DTYPE is not None else str
+
+    if cache_enabled and os.path.exists(snapshot_path):
+        if _snapshot_is_valid(csv_path, _read_meta(csv_path + META_SUFFIX), columns):
+            try:
+                table = feather.read_table(snapshot_path, memory_map=True)
+                if string_dtype is str:
+                    df = table.to_pandas()
+                else:
+                    df = table.to_pandas(types_mapper={pa.string(): string_dtype, pa.large_string(): string_dtype}.get)
+                logger.info(f"Loaded {csv_path} from snapshot {snapshot_path}")
+                return df
+            except Exception as e:
+                logger.warning(f"Failed to read snapshot {snapshot_path}, re-parsing CSV: {e}")
+        else:
+            logger.info(f"Snapshot {snapshot_path} is stale, re-parsing CSV")
+
+    # Parse only the projected columns; missing ones are reported by the caller
+    df = pd.read_csv(csv_path, usecols=lambda column: column in columns, dtype=string_dtype)
+
+    if cache_enabled and all(column in df.columns for column in columns):
+        try:
+            _write_snapshot(csv_path, df[columns], columns)
+            logger.info(f"Wrote snapshot {snapshot_path}")
+        except Exception as e:
+            logger.warning(f"Could not write snapshot {snapshot_path}: {e}")
+
+    return df